@@ -1,3 +1,4 @@
+import logging
 import os
 from dotenv import load_dotenv
 
@@ -12,6 +13,9 @@ APP_VERSION = "0.1.0"
 # Server settings
 HOST = os.getenv("HOST", "0.0.0.0")
 PORT = int(os.getenv("PORT", 8000))
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+RELOAD = os.getenv("DEV") == "1"  # Auto-reload on code changes; development only
+WORKERS = int(os.getenv("WORKERS", 1))  # Worker processes, ignored when reloading
 
 # CORS settings
 CORS_ORIGINS = ["*"]  # In production, specify your frontend domain
@@ -22,6 +26,8 @@ CORS_HEADERS = ["*"]
 # Redis settings
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
 SESSION_TTL = int(os.getenv("SESSION_TTL", 86400))  # Default: 24 hours
+MAX_HISTORY_MESSAGES = int(os.getenv("MAX_HISTORY_MESSAGES", 200))  # Most recent messages kept per session
+INGESTION_LOCK_TTL = int(os.getenv("INGESTION_LOCK_TTL", 1800))  # Seconds before a crashed worker's ingestion lock expires
 
 # Gemini API settings
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
@@ -29,9 +35,14 @@ GEMINI_MODEL = "gemini-2.5-flash-preview-04-17"
 
 # Vector DB settings
 EMBEDDINGS_MODEL = "jina-embeddings-v3"
+EMBED_DIM = int(os.getenv("EMBED_DIM", 0)) or None  # Embedding size; probed once from the Jina API when unset
 JINA_API_KEY = os.getenv("JINA_API_KEY")
-VECTOR_STORE_PATH = ":memory:"  # Use memory for development
+VECTOR_STORE_PATH = os.getenv("QDRANT_PATH", "./qdrant_data")  # Local directory, Qdrant server URL, or ":memory:"
 COLLECTION_NAME = "news_articles"
+QUERY_CACHE_COLLECTION = "query_cache"  # Semantic response cache
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "binary")  # News collection quantization: "binary", "scalar" (int8) or "none"
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", 128))  # Texts per Jina embedding request during ingestion
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", 4))  # Concurrent embedding requests, bounded to respect Jina rate limits
 
 # News sources for ingestion
 NEWS_SOURCES = [
@@ -45,7 +56,14 @@ NEWS_SOURCES = [
 # Chat settings
 RAG_NUM_CHUNKS = 3  # Number of chunks to retrieve
 
+# Semantic cache settings
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.95))  # Minimum cosine similarity for a hit
+SEMANTIC_CACHE_TTL = int(os.getenv("SEMANTIC_CACHE_TTL", 3600))  # Default: 1 hour
+EMBEDDING_CACHE_TTL = int(os.getenv("EMBEDDING_CACHE_TTL", 86400))  # Default: 24 hours
+
 # Check if Gemini API key is provided
 if not GEMINI_API_KEY or GEMINI_API_KEY == "your-gemini-api-key":
-    print("Warning: GEMINI_API_KEY not set or using default value. API calls to Gemini will fail.")
-    print("Please set a valid API key in the .env file or environment variables.")
+    logging.getLogger("config").warning(
+        "GEMINI_API_KEY not set or using default value. API calls to Gemini will fail. "
+        "Please set a valid API key in the .env file or environment variables."
+    )
@@ -1,16 +1,22 @@
 import asyncio
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
-from app.config import APP_TITLE, APP_DESCRIPTION, APP_VERSION
+from app.config import APP_TITLE, APP_DESCRIPTION, APP_VERSION, LOG_LEVEL
 from app.routes import chat, session, websocket
-from app.services.rag_service import ingest_news
+from app.utils.logging_setup import setup_logging, stop_logging
+
+setup_logging(LOG_LEVEL)
+logger = logging.getLogger("app")
 
 # Initialize FastAPI app
 app = FastAPI(
     title=APP_TITLE,
     description=APP_DESCRIPTION,
-    version=APP_VERSION
+    version=APP_VERSION,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -22,19 +28,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Include routers
+# Include routers (GET /status is served by the chat router)
 app.include_router(chat.router)
 app.include_router(session.router)
 # WebSocket routes are already defined in the router
 app.include_router(websocket.router)
 
-@app.get("/status", tags=["Health"])
-async def status():
-    """Health check endpoint for the application."""
-    return {"status": "ok", "service": APP_TITLE, "version": APP_VERSION}
-
 @app.on_event("startup")
 async def startup_event():
     """Initialize resources on startup."""
+    from app.services.rag_service import ingest_news
+
+    logger.info("Registered %s routes", len(app.router.routes))
+
     # Start news ingestion in background
-    asyncio.create_task(ingest_news()) 
\ No newline at end of file
+    asyncio.create_task(ingest_news())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release resources on shutdown."""
+    from app.services.rag_service import close_clients
+
+    await close_clients()
+    stop_logging()
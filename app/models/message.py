@@ -1,14 +1,39 @@
+import os
+import random
+import time
 import uuid
 from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel, Field
 
+# Per-process RNG for message IDs: seeded once instead of an os.urandom syscall per ID
+_id_random = random.Random()
+if hasattr(os, "register_at_fork"):  # POSIX only; Windows has no fork
+    os.register_at_fork(after_in_child=_id_random.seed)
+
+def uuid7() -> str:
+    """Generate a time-ordered UUIDv7 string."""
+    timestamp_ms = time.time_ns() // 1_000_000
+    rand = _id_random.getrandbits(74)
+    value = (
+        (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76  # version
+        | (rand >> 62) << 64  # rand_a (12 bits)
+        | 0b10 << 62  # RFC 4122 variant
+        | (rand & ((1 << 62) - 1))  # rand_b (62 bits)
+    )
+    return str(uuid.UUID(int=value))
+
+def current_timestamp() -> str:
+    """Current local time in ISO 8601 format."""
+    return datetime.now().isoformat()
+
 class Message(BaseModel):
     """Chat message model."""
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7)
     sender: str  # 'user' or 'bot'
     content: str
-    timestamp: str = Field(default_factory=lambda: datetime.now().isoformat())
+    timestamp: str = Field(default_factory=current_timestamp)
 
 class ChatRequest(BaseModel):
     """Request model for chat endpoint."""
@@ -18,7 +43,7 @@ class ChatRequest(BaseModel):
 class SessionResponse(BaseModel):
     """Response model for session creation."""
     sessionId: str
-    created: str = Field(default_factory=lambda: datetime.now().isoformat())
+    created: str = Field(default_factory=current_timestamp)
 
 class ChatHistory(BaseModel):
     """Chat history model."""
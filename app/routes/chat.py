@@ -1,8 +1,16 @@
-from fastapi import APIRouter, BackgroundTasks
+from typing import AsyncIterator
+import orjson
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 
-from app.models.message import Message, ChatRequest
-from app.services.redis_service import store_message
-from app.services.rag_service import generate_response, get_vector_store_status
+from app.models.message import Message, ChatRequest, current_timestamp
+from app.services.rag_service import (
+    generate_response,
+    generate_response_stream,
+    get_vector_store_status,
+    record_turn,
+    session_turn_lock
+)
 
 router = APIRouter(tags=["chat"])
 
@@ -12,21 +20,18 @@ async def root():
     return {"message": "Welcome to RAG News Chatbot API!"}
 
 @router.post("/chat")
-async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
+async def chat(request: ChatRequest, timestamp: str = Depends(current_timestamp)):
     """Process a chat message and return response."""
     session_id = request.sessionId
     user_message = request.message
     
-    # Store user message
-    user_msg = Message(sender="user", content=user_message)
-    await store_message(session_id, user_msg)
+    user_msg = Message(sender="user", content=user_message, timestamp=timestamp)
     
-    # Generate response (non-streaming)
-    response_text = await generate_response(user_message, session_id)
-    
-    # Store bot response
-    bot_msg = Message(sender="bot", content=response_text)
-    await store_message(session_id, bot_msg)
+    # Generate response (non-streaming) and store both messages in one write before the session's next turn starts
+    async with session_turn_lock(session_id):
+        response_text = await generate_response(user_message, session_id)
+        bot_msg = Message(sender="bot", content=response_text, timestamp=timestamp)
+        await record_turn(session_id, user_msg, bot_msg)
     
     return {
         "id": bot_msg.id,
@@ -34,6 +39,40 @@ async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
         "timestamp": bot_msg.timestamp
     }
 
+def sse_event(payload: dict) -> bytes:
+    """Encode a payload as a server-sent event."""
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest, timestamp: str = Depends(current_timestamp)):
+    """Process a chat message and stream the response as server-sent events."""
+    session_id = request.sessionId
+    user_message = request.message
+    
+    user_msg = Message(sender="user", content=user_message, timestamp=timestamp)
+    
+    async def event_stream() -> AsyncIterator[bytes]:
+        async with session_turn_lock(session_id):
+            # Send response deltas as they are generated
+            deltas = []
+            async for delta in generate_response_stream(user_message, session_id):
+                deltas.append(delta)
+                yield sse_event({"type": "partial_response", "delta": delta})
+            bot_msg = Message(sender="bot", content="".join(deltas), timestamp=timestamp)
+            
+            # Send complete message
+            yield sse_event({
+                "type": "complete_response",
+                "id": bot_msg.id,
+                "content": bot_msg.content,
+                "timestamp": bot_msg.timestamp
+            })
+            
+            # Store user message and complete bot response in one write
+            await record_turn(session_id, user_msg, bot_msg)
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 @router.get("/status")
 async def get_status():
     """Get system status."""
@@ -67,6 +106,7 @@ async def get_status():
             "sources_processed": f"{ingestion_info['sources_processed']}/{ingestion_info['total_sources']}",
             "articles_processed": ingestion_info["articles_processed"],
             "articles_failed": ingestion_info["articles_failed"],
+            "articles_skipped": ingestion_info["articles_skipped"],
             "chunks_created": ingestion_info["chunks_created"],
             "elapsed_time": ingestion_info["elapsed_time_seconds"]
         },
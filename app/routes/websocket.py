@@ -1,14 +1,20 @@
-import json
-import asyncio
+import logging
 import uuid
+import orjson
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
-from app.models.message import Message
-from app.services.redis_service import store_message
-from app.services.rag_service import generate_response
+from app.models.message import Message, current_timestamp
+from app.services.rag_service import generate_response_stream, record_turn, session_turn_lock
+
+logger = logging.getLogger("websocket_routes")
 
 router = APIRouter(tags=["websocket"])
 
+async def send_json(websocket: WebSocket, payload: dict):
+    """Send a JSON text frame serialized with orjson."""
+    # Text frames keep browser clients' JSON.parse(event.data) working; orjson still skips json.dumps
+    await websocket.send_text(orjson.dumps(payload).decode("utf-8"))
+
 # WebSocket for streaming responses
 @router.websocket("/ws/chat/{session_id}")
 async def websocket_chat(websocket: WebSocket, session_id: str):
@@ -18,43 +24,41 @@ async def websocket_chat(websocket: WebSocket, session_id: str):
         while True:
             # Receive message from client
             data = await websocket.receive_text()
-            message_data = json.loads(data)
+            message_data = orjson.loads(data)
             user_message = message_data.get("message", "")
             
-            # Store user message
-            user_msg = Message(sender="user", content=user_message)
-            await store_message(session_id, user_msg)
+            timestamp = current_timestamp()
+            user_msg = Message(sender="user", content=user_message, timestamp=timestamp)
             
             # Generate response
             task_id = str(uuid.uuid4())
             
             # Send typing indicator
-            await websocket.send_json({"type": "typing_start", "taskId": task_id})
-            
-            # Stream response (simulated)
-            response_text = await generate_response(user_message, session_id, task_id)
-            bot_msg = Message(sender="bot", content=response_text)
+            await send_json(websocket, {"type": "typing_start", "taskId": task_id})
             
-            # For demo, we'll stream character by character
-            for i in range(len(response_text)):
-                partial_text = response_text[:i+1]
-                await websocket.send_json({
-                    "type": "partial_response",
-                    "taskId": task_id,
-                    "content": partial_text
+            async with session_turn_lock(session_id):
+                # Stream response deltas as they are generated
+                deltas = []
+                async for delta in generate_response_stream(user_message, session_id, task_id):
+                    deltas.append(delta)
+                    await send_json(websocket, {
+                        "type": "partial_response",
+                        "taskId": task_id,
+                        "delta": delta
+                    })
+                response_text = "".join(deltas)
+                bot_msg = Message(sender="bot", content=response_text, timestamp=timestamp)
+                
+                # Send complete message
+                await send_json(websocket, {
+                    "type": "complete_response",
+                    "id": bot_msg.id,
+                    "content": bot_msg.content,
+                    "timestamp": bot_msg.timestamp
                 })
-                await asyncio.sleep(0.02)  # Adjust speed as needed
-            
-            # Send complete message
-            await websocket.send_json({
-                "type": "complete_response",
-                "id": bot_msg.id,
-                "content": bot_msg.content,
-                "timestamp": bot_msg.timestamp
-            })
-            
-            # Store complete bot response
-            await store_message(session_id, bot_msg)
+                
+                # Store user message and complete bot response in one write
+                await record_turn(session_id, user_msg, bot_msg)
             
     except WebSocketDisconnect:
-        print(f"WebSocket disconnected for session {session_id}") 
\ No newline at end of file
+        logger.debug("WebSocket disconnected for session %s", session_id)
\ No newline at end of file
@@ -1,57 +1,109 @@
-import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+import msgpack
 import redis.asyncio as redis
 
 from app.models.message import Message
-from app.config import REDIS_URL, SESSION_TTL
+from app.config import REDIS_URL, SESSION_TTL, MAX_HISTORY_MESSAGES, EMBEDDING_CACHE_TTL, INGESTION_LOCK_TTL
 
-# Initialize Redis client
-redis_client = redis.from_url(REDIS_URL, decode_responses=True)
+# Initialize Redis client (raw bytes, since chat history entries are stored as MessagePack)
+redis_client = redis.from_url(REDIS_URL, decode_responses=False)
+
+INGESTION_LOCK_KEY = "ingestion_lock"
+# Delete the lock only if this worker still owns it, so an expired lock taken over by another worker is kept
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+SCAN_COUNT = 500  # Keys requested per SCAN iteration
+DELETE_BATCH_SIZE = 256  # Keys unlinked per pipeline
 
 async def get_redis_connection():
     """Get Redis connection."""
     return redis_client
 
+def _history_key(session_id: str) -> str:
+    """Key of the session's message LIST, newest message first."""
+    return f"chat_history:{session_id}"
+
+def _session_key(session_id: str) -> str:
+    """Key marking that a session exists, since an empty LIST cannot be stored."""
+    return f"session:{session_id}"
+
+def _pack_message(message: Message) -> bytes:
+    """Serialize a message to MessagePack."""
+    return msgpack.packb(message.model_dump(), use_bin_type=True)
+
+def _unpack_message(entry: bytes) -> Dict[str, Any]:
+    """Deserialize a MessagePack-encoded message dict."""
+    return msgpack.unpackb(entry, raw=False)
+
+def _to_messages(entries: List[bytes]) -> List[Message]:
+    """Build Message models in chronological order from LIST entries, skipping validation of trusted data."""
+    return [Message.model_construct(**_unpack_message(entry)) for entry in reversed(entries)]
+
 async def store_message(session_id: str, message: Message, redis_conn=None):
     """Store a message in Redis."""
+    await store_messages(session_id, [message], redis_conn)
+
+async def store_messages(session_id: str, new_messages: List[Message], redis_conn=None):
+    """Append messages to the session history in a single round-trip, keeping the newest MAX_HISTORY_MESSAGES."""
     if redis_conn is None:
         redis_conn = await get_redis_connection()
     
-    key = f"chat_history:{session_id}"
-    
-    # Get existing messages or initialize empty list
-    session_data = await redis_conn.get(key)
-    
-    if session_data:
-        messages = json.loads(session_data)
-        messages.append(message.model_dump())
-    else:
-        messages = [message.model_dump()]
-    
-    # Store updated messages and set TTL
-    await redis_conn.set(key, json.dumps(messages), ex=SESSION_TTL)
+    key = _history_key(session_id)
+    async with redis_conn.pipeline(transaction=False) as pipe:
+        # LPUSH pushes its values one by one, so the last message ends up at the head
+        pipe.lpush(key, *[_pack_message(message) for message in new_messages])
+        pipe.ltrim(key, 0, MAX_HISTORY_MESSAGES - 1)
+        pipe.expire(key, SESSION_TTL)
+        pipe.set(_session_key(session_id), b"", ex=SESSION_TTL)
+        await pipe.execute()
 
 async def get_session_history(session_id: str, redis_conn=None) -> List[Message]:
     """Get session chat history from Redis."""
     if redis_conn is None:
         redis_conn = await get_redis_connection()
     
-    key = f"chat_history:{session_id}"
-    session_data = await redis_conn.get(key)
+    entries = await redis_conn.lrange(_history_key(session_id), 0, -1)
+    return _to_messages(entries)
+
+async def get_recent_history(session_id: str, n: int = 10, redis_conn=None) -> List[Message]:
+    """Get the newest n messages of a session in chronological order, decoding nothing older."""
+    if redis_conn is None:
+        redis_conn = await get_redis_connection()
     
-    if session_data:
-        messages_data = json.loads(session_data)
-        return [Message(**msg) for msg in messages_data]
+    entries = await redis_conn.lrange(_history_key(session_id), 0, n - 1)
+    return _to_messages(entries)
+
+async def get_latest_message_id(session_id: str, redis_conn=None) -> Optional[str]:
+    """Get the ID of a session's newest message, or None if its history is empty."""
+    if redis_conn is None:
+        redis_conn = await get_redis_connection()
     
-    return []
+    entry = await redis_conn.lindex(_history_key(session_id), 0)
+    return _unpack_message(entry).get("id") if entry else None
+
+async def get_history_with_existence(session_id: str, redis_conn=None) -> Tuple[bool, List[Message]]:
+    """Check that a session exists and get its chat history in a single round-trip."""
+    if redis_conn is None:
+        redis_conn = await get_redis_connection()
+    
+    async with redis_conn.pipeline(transaction=False) as pipe:
+        pipe.exists(_session_key(session_id))
+        pipe.lrange(_history_key(session_id), 0, -1)
+        exists, entries = await pipe.execute()
+    
+    return exists > 0, _to_messages(entries)
 
 async def delete_session(session_id: str, redis_conn=None) -> bool:
     """Delete a session from Redis."""
     if redis_conn is None:
         redis_conn = await get_redis_connection()
     
-    key = f"chat_history:{session_id}"
-    result = await redis_conn.delete(key)
+    result = await redis_conn.delete(_session_key(session_id), _history_key(session_id))
     return result > 0
 
 async def create_session(session_id: str, redis_conn=None) -> bool:
@@ -59,8 +111,7 @@ async def create_session(session_id: str, redis_conn=None) -> bool:
     if redis_conn is None:
         redis_conn = await get_redis_connection()
     
-    key = f"chat_history:{session_id}"
-    await redis_conn.set(key, json.dumps([]), ex=SESSION_TTL)
+    await redis_conn.set(_session_key(session_id), b"", ex=SESSION_TTL)
     return True
 
 async def session_exists(session_id: str, redis_conn=None) -> bool:
@@ -68,40 +119,39 @@ async def session_exists(session_id: str, redis_conn=None) -> bool:
     if redis_conn is None:
         redis_conn = await get_redis_connection()
     
-    key = f"chat_history:{session_id}"
-    return await redis_conn.exists(key) > 0
+    return await redis_conn.exists(_session_key(session_id)) > 0
 
 async def get_all_sessions(redis_conn=None) -> List[Dict[str, Any]]:
     """Get all active sessions with their metadata."""
     if redis_conn is None:
         redis_conn = await get_redis_connection()
     
-    # Get all keys matching the chat history pattern
-    pattern = "chat_history:*"
-    keys = await redis_conn.keys(pattern)
+    # Iterate session markers without blocking Redis like KEYS would
+    pattern = "session:*"
+    keys = [key async for key in redis_conn.scan_iter(match=pattern, count=SCAN_COUNT)]
+    
+    session_ids = [key.split(b":", 1)[1].decode() for key in keys]  # Extract session IDs from keys
+    
+    # Get message counts and the newest/oldest messages of every session in one round-trip
+    async with redis_conn.pipeline(transaction=False) as pipe:
+        for session_id in session_ids:
+            history_key = _history_key(session_id)
+            pipe.llen(history_key)
+            pipe.lindex(history_key, 0)
+            pipe.lindex(history_key, -1)
+        results = await pipe.execute()
     
     sessions = []
-    for key in keys:
-        session_id = key.split(":", 1)[1]  # Extract session ID from key
+    for index, session_id in enumerate(session_ids):
+        message_count, newest, oldest = results[3 * index:3 * index + 3]
         
-        # Get message count and creation time
-        session_data = await redis_conn.get(key)
-        message_count = 0
-        
-        if session_data:
-            messages = json.loads(session_data)
-            message_count = len(messages)
-            
-            # Get first and last message timestamps if available
-            first_timestamp = messages[0].get("timestamp") if messages else None
-            last_timestamp = messages[-1].get("timestamp") if messages else None
-            
-            sessions.append({
-                "session_id": session_id,
-                "message_count": message_count,
-                "created_at": first_timestamp,
-                "last_active": last_timestamp
-            })
+        # History is stored newest first
+        sessions.append({
+            "session_id": session_id,
+            "message_count": message_count,
+            "created_at": _unpack_message(oldest).get("timestamp") if oldest else None,
+            "last_active": _unpack_message(newest).get("timestamp") if newest else None
+        })
     
     # Sort by last active timestamp, most recent first
     def safe_sort_key(session):
@@ -118,16 +168,47 @@ async def delete_all_sessions(redis_conn=None) -> Dict[str, Any]:
     if redis_conn is None:
         redis_conn = await get_redis_connection()
     
-    # Get all keys matching the chat history pattern
-    pattern = "chat_history:*"
-    keys = await redis_conn.keys(pattern)
+    # Iterate session markers without blocking Redis like KEYS would
+    pattern = "session:*"
+    keys = [key async for key in redis_conn.scan_iter(match=pattern, count=SCAN_COUNT)]
     
-    # Delete all session keys
+    # UNLINK frees memory in the background; send each batch of sessions as one pipeline
     deleted_count = 0
-    if keys:
-        deleted_count = await redis_conn.delete(*keys)
+    for start in range(0, len(keys), DELETE_BATCH_SIZE):
+        async with redis_conn.pipeline(transaction=False) as pipe:
+            for key in keys[start:start + DELETE_BATCH_SIZE]:
+                pipe.unlink(key, _history_key(key.split(b":", 1)[1].decode()))
+            deleted_count += sum(1 for removed in await pipe.execute() if removed)
     
     return {
         "deleted_count": deleted_count,
         "success": True
-    } 
\ No newline at end of file
+    }
+
+async def store_cached_embedding(query_hash: str, embedding: bytes, redis_conn=None):
+    """Persist a query embedding (raw float32 bytes) in Redis."""
+    if redis_conn is None:
+        redis_conn = await get_redis_connection()
+    
+    await redis_conn.set(f"embcache:{query_hash}", embedding, ex=EMBEDDING_CACHE_TTL)
+
+async def get_cached_embedding(query_hash: str, redis_conn=None) -> Optional[bytes]:
+    """Get a persisted query embedding (raw float32 bytes) from Redis."""
+    if redis_conn is None:
+        redis_conn = await get_redis_connection()
+    
+    return await redis_conn.get(f"embcache:{query_hash}")
+
+async def acquire_ingestion_lock(owner: str, redis_conn=None) -> bool:
+    """Try to become the one worker that ingests news; the lock expires after INGESTION_LOCK_TTL."""
+    if redis_conn is None:
+        redis_conn = await get_redis_connection()
+    
+    return bool(await redis_conn.set(INGESTION_LOCK_KEY, owner, nx=True, ex=INGESTION_LOCK_TTL))
+
+async def release_ingestion_lock(owner: str, redis_conn=None):
+    """Release the ingestion lock if it is still held by owner."""
+    if redis_conn is None:
+        redis_conn = await get_redis_connection()
+    
+    await redis_conn.eval(RELEASE_LOCK_SCRIPT, 1, INGESTION_LOCK_KEY, owner)
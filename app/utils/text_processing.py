@@ -0,0 +1,22 @@
+import functools
+from typing import List
+
+# These functions run in the ingestion process pool, so they must stay picklable module-level functions.
+
+def extract_text(html: bytes) -> str:
+    """Extract the visible text of an article page."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "lxml")
+    return soup.get_text(separator="\n", strip=True)
+
+@functools.lru_cache(maxsize=None)
+def _get_text_splitter(chunk_size: int, chunk_overlap: int):
+    """Build the text splitter once per worker process."""
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    return RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+def extract_chunks(html: bytes, chunk_size: int, chunk_overlap: int) -> List[str]:
+    """Extract the visible text of an article page and split it into chunks for embedding."""
+    return _get_text_splitter(chunk_size, chunk_overlap).split_text(extract_text(html))
@@ -1,11 +1,14 @@
 import os
 import sys
+import asyncio
+import functools
+import hashlib
+import io
 from dotenv import load_dotenv
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient
 from qdrant_client.http import models
 import argparse
 import json
-from langchain_community.vectorstores import Qdrant
 from langchain_community.embeddings import JinaEmbeddings
 import logging
 
@@ -19,22 +22,103 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
-def check_qdrant_collection(collection_name="news_articles", limit=5):
+QDRANT_HOST = "localhost"
+QDRANT_PORT = 6333
+QDRANT_GRPC_PORT = 6334
+
+# Payload fields shown for sample points ("metadata" holds source/url/title for LangChain-written points)
+SAMPLE_PAYLOAD_FIELDS = ["text", "page_content", "source", "timestamp", "created_at", "metadata"]
+
+SCROLL_PAGE_SIZE = 64  # Points fetched per scroll request
+
+_CLIENT = None
+
+def _trunc(text, n=100):
+    """Truncate text to n characters, marking the cut with '...'"""
+    return text if len(text) <= n else f"{text[:n]}..."
+
+async def _connect():
     """
-    Check if a Qdrant collection exists and has embeddings
+    Connect to the local Qdrant instance over gRPC, falling back to REST and then to in-memory Qdrant
     """
-    try:
-        # Try to connect to local Qdrant instance first
+    candidates = [
+        (f"Qdrant gRPC at {QDRANT_HOST}:{QDRANT_GRPC_PORT}",
+         lambda: AsyncQdrantClient(host=QDRANT_HOST, grpc_port=QDRANT_GRPC_PORT, prefer_grpc=True)),
+        (f"Qdrant at http://{QDRANT_HOST}:{QDRANT_PORT}",
+         lambda: AsyncQdrantClient(url=f"http://{QDRANT_HOST}:{QDRANT_PORT}")),
+        ("in-memory Qdrant", lambda: AsyncQdrantClient(":memory:")),
+    ]
+    for description, create_client in candidates:
+        client = create_client()
         try:
-            client = QdrantClient(url="http://localhost:6333")
-            collections = client.get_collections().collections
-            logger.info(f"Connected to Qdrant at http://localhost:6333")
+            await client.get_collections()
         except Exception:
-            # If local connection fails, try in-memory Qdrant
-            logger.info("Local Qdrant connection failed, trying in-memory Qdrant")
-            client = QdrantClient(":memory:")
-            collections = client.get_collections().collections
-            logger.info("Connected to in-memory Qdrant")
+            logger.info(f"Connection to {description} failed")
+            await client.close()
+            continue
+        logger.info(f"Connected to {description}")
+        return client
+    raise ConnectionError("Could not connect to Qdrant")
+
+async def get_client():
+    """
+    Get the shared Qdrant client, connecting on first use
+    """
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = await _connect()
+    return _CLIENT
+
+class CachedEmbeddings:
+    """
+    Embeddings adapter that memoizes results, so repeated texts skip the Jina API round-trip
+    """
+    def __init__(self, embeddings):
+        self._embeddings = embeddings
+        self._document_cache = {}
+        self.embed_query = functools.lru_cache(maxsize=256)(embeddings.embed_query)
+
+    @staticmethod
+    def _key(text):
+        return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+    def embed_documents(self, texts):
+        keys = [self._key(text) for text in texts]
+        
+        # Embed only texts not seen before, in a single request
+        uncached = {key: text for key, text in zip(keys, texts) if key not in self._document_cache}
+        if uncached:
+            vectors = self._embeddings.embed_documents(list(uncached.values()))
+            self._document_cache.update(zip(uncached.keys(), vectors))
+        
+        return [self._document_cache[key] for key in keys]
+
+async def iter_points(client, collection_name, limit, page=SCROLL_PAGE_SIZE):
+    """
+    Iterate over up to `limit` points of a collection, one scroll page at a time, following the scroll cursor
+    """
+    offset = None
+    while limit > 0:
+        points, offset = await client.scroll(
+            collection_name=collection_name,
+            limit=min(page, limit),
+            offset=offset,
+            # Only fetch the payload fields displayed for samples; the dimension is known from the collection config
+            with_payload=models.PayloadSelectorInclude(include=SAMPLE_PAYLOAD_FIELDS),
+            with_vectors=False
+        )
+        for point in points[:limit]:
+            yield point
+        limit -= len(points)
+        if offset is None:
+            break
+
+async def check_qdrant_collection(client, collection_name="news_articles", limit=5):
+    """
+    Check if a Qdrant collection exists and has embeddings
+    """
+    try:
+        collections = (await client.get_collections()).collections
             
         # Check if our collection exists
         collection_names = [collection.name for collection in collections]
@@ -44,13 +128,22 @@ def check_qdrant_collection(collection_name="news_articles", limit=5):
             logger.error(f"Collection '{collection_name}' not found")
             return False
             
-        # Get collection info
-        collection_info = client.get_collection(collection_name=collection_name)
+        # Collection info already reports the point count, so no separate count() call is needed
+        collection_info = await client.get_collection(collection_name=collection_name)
         logger.info(f"Collection '{collection_name}' info: {collection_info}")
         
-        # Count points in the collection
-        count_result = client.count(collection_name=collection_name)
-        count = count_result.count
+        # Vector dimension from the collection config (a dict of params for named vectors)
+        vectors_config = collection_info.config.params.vectors
+        if isinstance(vectors_config, dict):
+            for vector_name, params in vectors_config.items():
+                logger.info(f"Vector '{vector_name}' dimension: {params.size}")
+        else:
+            logger.info(f"Vector dimension: {vectors_config.size}")
+        
+        # points_count is approximate but enough for an emptiness check; fall back to vectors_count
+        count = collection_info.points_count
+        if count is None:
+            count = collection_info.vectors_count or 0
         logger.info(f"Collection '{collection_name}' contains {count} points")
         
         if count == 0:
@@ -60,15 +153,14 @@ def check_qdrant_collection(collection_name="news_articles", limit=5):
         # Retrieve sample points to check content
         if count > 0:
             logger.info(f"Retrieving {min(limit, count)} sample points:")
-            points = client.scroll(
-                collection_name=collection_name,
-                limit=min(limit, count)
-            )[0]
-            
-            for i, point in enumerate(points):
-                logger.info(f"Point {i+1}:")
+            i = 0
+            async for point in iter_points(client, collection_name, limit):
+                i += 1
+                # Build the whole report for a point and log it in a single record
+                buf = io.StringIO()
+                print(f"Point {i}:", file=buf)
                 # Display point ID
-                logger.info(f"  ID: {point.id}")
+                print(f"  ID: {point.id}", file=buf)
                 
                 # Display metadata (condensed view of key fields)
                 if hasattr(point, 'payload') and point.payload:
@@ -77,28 +169,17 @@ def check_qdrant_collection(collection_name="news_articles", limit=5):
                     source = metadata.get('source', 'Unknown source')
                     timestamp = metadata.get('timestamp', metadata.get('created_at', 'No timestamp'))
                     
-                    # Truncate text if it's too long
-                    if text and len(text) > 100:
-                        text = text[:100] + "..."
-                        
-                    logger.info(f"  Source: {source}")
-                    logger.info(f"  Timestamp: {timestamp}")
-                    logger.info(f"  Text snippet: {text}")
+                    print(f"  Source: {source}", file=buf)
+                    print(f"  Timestamp: {timestamp}", file=buf)
+                    print(f"  Text snippet: {_trunc(text) if text else text}", file=buf)
                     
                     # Count keys in metadata
-                    logger.info(f"  Metadata keys: {list(metadata.keys())}")
+                    print(f"  Metadata keys: {list(metadata.keys())}", file=buf)
                 else:
-                    logger.info("  No payload/metadata found")
-                
-                # Check if vector exists and show its dimension
-                if hasattr(point, 'vector') and point.vector:
-                    vector_dim = len(point.vector)
-                    logger.info(f"  Vector dimension: {vector_dim}")
-                else:
-                    logger.info("  No vector found")
+                    print("  No payload/metadata found", file=buf)
                     
-                logger.info("-" * 40)
-            
+                buf.write("-" * 40)
+                logger.info(buf.getvalue())
             return True
         
         return False
@@ -107,37 +188,34 @@ def check_qdrant_collection(collection_name="news_articles", limit=5):
         logger.error(f"Error checking Qdrant collection: {str(e)}")
         return False
 
-def perform_test_query(collection_name="news_articles", query="latest news"):
+@functools.lru_cache(maxsize=None)
+def get_embeddings():
+    """
+    Get the shared, memoizing Jina embeddings
+    """
+    return CachedEmbeddings(JinaEmbeddings(
+        jina_api_key=os.getenv("JINA_API_KEY"),
+        model_name="jina-embeddings-v2-base-en"
+    ))
+
+async def perform_test_query(client, collection_name="news_articles", query="latest news"):
     """
     Perform a test query against the vector store to check if it returns relevant results
     """
     try:
-        # Initialize Jina embeddings
-        embedding = JinaEmbeddings(
-            jina_api_key=os.getenv("JINA_API_KEY"),
-            model_name="jina-embeddings-v2-base-en"
-        )
-        
-        # Try to connect to local Qdrant instance first
-        try:
-            client = QdrantClient(url="http://localhost:6333")
-            logger.info("Connected to Qdrant at http://localhost:6333")
-        except Exception:
-            # If local connection fails, try in-memory Qdrant
-            logger.info("Local Qdrant connection failed, trying in-memory Qdrant")
-            client = QdrantClient(":memory:")
-            logger.info("Connected to in-memory Qdrant")
-        
-        # Create Qdrant store object
-        vector_store = Qdrant(
-            client=client,
-            collection_name=collection_name,
-            embeddings=embedding
-        )
+        # Initialize Jina embeddings (shared, so repeat queries are not re-embedded)
+        embedding = get_embeddings()
         
         # Perform similarity search
         logger.info(f"Performing test query: '{query}'")
-        results = vector_store.similarity_search(query, k=3)
+        query_vector = await asyncio.to_thread(embedding.embed_query, query)
+        results = await client.search(
+            collection_name=collection_name,
+            query_vector=query_vector,
+            limit=3,
+            with_payload=True,
+            with_vectors=False  # Only the payload is displayed; skip sending vectors back
+        )
         
         if not results:
             logger.warning("No results found for the test query")
@@ -145,16 +223,14 @@ def perform_test_query(collection_name="news_articles", query="latest news"):
             
         logger.info(f"Found {len(results)} results for query: '{query}'")
         
-        # Display results
-        for i, doc in enumerate(results):
-            logger.info(f"Result {i+1}:")
-            # Truncate text if it's too long
-            content = doc.page_content
-            if len(content) > 100:
-                content = content[:100] + "..."
-            logger.info(f"  Content: {content}")
-            logger.info(f"  Metadata: {doc.metadata}")
-            logger.info("-" * 40)
+        # Display results (payload layout written by the LangChain Qdrant wrapper)
+        for i, point in enumerate(results):
+            buf = io.StringIO()
+            print(f"Result {i+1}:", file=buf)
+            print(f"  Content: {_trunc(point.payload.get('page_content', ''))}", file=buf)
+            print(f"  Metadata: {point.payload.get('metadata')}", file=buf)
+            buf.write("-" * 40)
+            logger.info(buf.getvalue())
             
         return True
         
@@ -162,6 +238,25 @@ def perform_test_query(collection_name="news_articles", query="latest news"):
         logger.error(f"Error performing test query: {str(e)}")
         return False
 
+async def main(args):
+    try:
+        client = await get_client()
+    except ConnectionError as e:
+        logger.error(str(e))
+        return False
+    
+    try:
+        # Check if collection exists and has embeddings
+        success = await check_qdrant_collection(client, args.collection, args.limit)
+        
+        # Run test query if requested
+        if success and args.test_query:
+            await perform_test_query(client, args.collection, args.query)
+    finally:
+        await client.close()
+    
+    return success
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Check Qdrant vector store")
     parser.add_argument("--collection", default="news_articles", help="Collection name to check")
@@ -171,11 +266,6 @@ if __name__ == "__main__":
     
     args = parser.parse_args()
     
-    # Check if collection exists and has embeddings
-    success = check_qdrant_collection(args.collection, args.limit)
-    
-    # Run test query if requested
-    if success and args.test_query:
-        perform_test_query(args.collection, args.query)
+    success = asyncio.run(main(args))
     
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -1,6 +1,11 @@
+import sys
 import uvicorn
-from app.config import HOST, PORT
+from app.config import HOST, PORT, RELOAD, WORKERS, VECTOR_STORE_PATH
 
 if __name__ == "__main__":
+    # An embedded Qdrant store belongs to a single process; only a Qdrant server can be shared by workers
+    if WORKERS > 1 and not VECTOR_STORE_PATH.startswith(("http://", "https://")):
+        sys.exit("WORKERS > 1 requires QDRANT_PATH to be a Qdrant server URL (http:// or https://)")
+
     # Run the application
-    uvicorn.run("app.main:app", host=HOST, port=PORT, reload=True)
\ No newline at end of file
+    uvicorn.run("app.main:app", host=HOST, port=PORT, reload=RELOAD, workers=WORKERS)
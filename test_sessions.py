@@ -10,16 +10,59 @@ This script will:
 
 import asyncio
 import aiohttp
+import functools
 import json
+import operator
 import sys
 from datetime import datetime
 
 # Base URL for the API
 BASE_URL = "http://localhost:8000"
+HISTORY_POLL_ATTEMPTS = 10
+HISTORY_POLL_INTERVAL = 0.2  # Seconds between history checks
+
+# Session table columns; the API always returns every key, with null timestamps for empty sessions
+_session_fields = operator.itemgetter('session_id', 'message_count', 'created_at', 'last_active')
+TABLE_HEADER = f"{'SESSION ID':<36} | {'MESSAGES':<8} | {'CREATED':<19} | {'LAST ACTIVE':<19}"
+TABLE_RULE = "-" * 80
+
+def _trunc(text, n=100):
+    """Truncate text to n characters, marking the cut with '...'"""
+    return text if len(text) <= n else f"{text[:n]}..."
+
+@functools.lru_cache(maxsize=1024)
+def _fmt(ts):
+    """Format an ISO timestamp for the session table, or 'N/A' if missing or invalid."""
+    if not ts or ts == 'N/A':
+        return 'N/A'
+    try:
+        return datetime.fromisoformat(ts.replace('Z', '+00:00')).strftime('%Y-%m-%d %H:%M:%S')
+    except (ValueError, AttributeError):
+        return 'N/A'
+
+def create_client_session():
+    """Create an HTTP session that keeps connections to the API alive across requests."""
+    connector = aiohttp.TCPConnector(limit=32, ttl_dns_cache=300, keepalive_timeout=60)
+    return aiohttp.ClientSession(connector=connector)
+
+async def fetch_json(session, method, url, **kwargs):
+    """Send a request and return the decoded JSON response."""
+    async with session.request(method, url, **kwargs) as response:
+        return await response.json()
+
+async def wait_for_history(session, session_id, expected):
+    """Poll a session's history until it holds the expected number of messages, returning what was last seen."""
+    for _ in range(HISTORY_POLL_ATTEMPTS):
+        history = await fetch_json(session, "GET", f"{BASE_URL}/history/{session_id}")
+        messages = history.get('messages', [])
+        if len(messages) >= expected:
+            break
+        await asyncio.sleep(HISTORY_POLL_INTERVAL)
+    return messages
 
 async def test_sessions():
     """Test session management endpoints."""
-    async with aiohttp.ClientSession() as session:
+    async with create_client_session() as session:
         # 1. List all existing sessions
         print("Fetching all sessions...")
         async with session.get(f"{BASE_URL}/sessions") as response:
@@ -28,31 +71,15 @@ async def test_sessions():
             
             # Print session details in a formatted way
             if response_data['count'] > 0:
-                print("\nEXISTING SESSIONS:")
-                print("-" * 80)
-                print(f"{'SESSION ID':<36} | {'MESSAGES':<8} | {'CREATED':<19} | {'LAST ACTIVE':<19}")
-                print("-" * 80)
+                lines = ["\nEXISTING SESSIONS:", TABLE_RULE, TABLE_HEADER, TABLE_RULE]
                 
                 for s in response_data['sessions']:
-                    created = s.get('created_at', 'N/A')
-                    if created and created != 'N/A':
-                        try:
-                            created = datetime.fromisoformat(created.replace('Z', '+00:00')).strftime('%Y-%m-%d %H:%M:%S')
-                        except (ValueError, AttributeError):
-                            created = 'N/A'
-                    else:
-                        created = 'N/A'
-                    
-                    last_active = s.get('last_active', 'N/A')
-                    if last_active and last_active != 'N/A':
-                        try:
-                            last_active = datetime.fromisoformat(last_active.replace('Z', '+00:00')).strftime('%Y-%m-%d %H:%M:%S')
-                        except (ValueError, AttributeError):
-                            last_active = 'N/A'
-                    else:
-                        last_active = 'N/A'
+                    sid, message_count, created, last_active = _session_fields(s)
                     
-                    print(f"{s['session_id']:<36} | {s['message_count']:<8} | {created:<19} | {last_active:<19}")
+                    lines.append(f"{sid:<36} | {message_count:<8} | {_fmt(created):<19} | {_fmt(last_active):<19}")
+                
+                # Write the whole table at once rather than flushing line by line
+                sys.stdout.write("\n".join(lines) + "\n")
             else:
                 print("\nNo active sessions found.")
         
@@ -70,50 +97,39 @@ async def test_sessions():
             json={"sessionId": session_id, "message": "Test message from session script"}
         ) as response:
             message_response = await response.json()
-            print(f"Sent test message, received response: {message_response['content'][:50]}...")
+            print(f"Sent test message, received response: {_trunc(message_response['content'], 50)}")
         
-        # 4. List sessions again to verify the new one
-        print("\nFetching all sessions again...")
-        async with session.get(f"{BASE_URL}/sessions") as response:
-            response_data = await response.json()
-            print(f"Now found {response_data['count']} active sessions")
-            
-            # Check if our new session is in the list
-            new_session_found = any(s['session_id'] == session_id for s in response_data['sessions'])
-            print(f"New session {'found' if new_session_found else 'NOT found'} in the list")
+        # 4. List sessions again and wait for the test exchange to appear in the new session's history
+        print("\nFetching all sessions and the new session's history...")
+        response_data, messages = await asyncio.gather(
+            fetch_json(session, "GET", f"{BASE_URL}/sessions"),
+            wait_for_history(session, session_id, 2)
+        )
+        print(f"Now found {response_data['count']} active sessions")
+        if len(messages) >= 2:
+            print(f"New session history holds the test exchange ({len(messages)} messages)")
+        else:
+            print(f"Warning: new session history holds only {len(messages)} of 2 messages")
+        
+        # Check if our new session is in the list
+        new_session_found = any(s['session_id'] == session_id for s in response_data['sessions'])
+        print(f"New session {'found' if new_session_found else 'NOT found'} in the list")
+        
+        # Print session details again
+        if response_data['count'] > 0:
+            lines = ["\nCURRENT SESSIONS:", TABLE_RULE, TABLE_HEADER, TABLE_RULE]
             
-            # Print session details again
-            if response_data['count'] > 0:
-                print("\nCURRENT SESSIONS:")
-                print("-" * 80)
-                print(f"{'SESSION ID':<36} | {'MESSAGES':<8} | {'CREATED':<19} | {'LAST ACTIVE':<19}")
-                print("-" * 80)
+            for s in response_data['sessions']:
+                sid, message_count, created, last_active = _session_fields(s)
                 
-                for s in response_data['sessions']:
-                    created = s.get('created_at', 'N/A')
-                    if created and created != 'N/A':
-                        try:
-                            created = datetime.fromisoformat(created.replace('Z', '+00:00')).strftime('%Y-%m-%d %H:%M:%S')
-                        except (ValueError, AttributeError):
-                            created = 'N/A'
-                    else:
-                        created = 'N/A'
-                    
-                    last_active = s.get('last_active', 'N/A')
-                    if last_active and last_active != 'N/A':
-                        try:
-                            last_active = datetime.fromisoformat(last_active.replace('Z', '+00:00')).strftime('%Y-%m-%d %H:%M:%S')
-                        except (ValueError, AttributeError):
-                            last_active = 'N/A'
-                    else:
-                        last_active = 'N/A'
-                    
-                    session_marker = " (new)" if s['session_id'] == session_id else ""
-                    print(f"{s['session_id']:<36} | {s['message_count']:<8} | {created:<19} | {last_active:<19}{session_marker}")
+                session_marker = " (new)" if sid == session_id else ""
+                lines.append(f"{sid:<36} | {message_count:<8} | {_fmt(created):<19} | {_fmt(last_active):<19}{session_marker}")
+            
+            sys.stdout.write("\n".join(lines) + "\n")
 
 async def test_delete_all_sessions():
     """Test deleting all sessions."""
-    async with aiohttp.ClientSession() as session:
+    async with create_client_session() as session:
         # 1. List all existing sessions
         print("Fetching current sessions...")
         async with session.get(f"{BASE_URL}/sessions") as response: